@@ -1,20 +1,80 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, request
+import functools
+import itertools
+import json
 import random
 import math
+import os
+import time
 
 app = Flask(__name__)
 
+# Private generator so key generation skips the module-level random wrappers
+_rng = random.Random()
+
 # ─── Hash Collision Logic ────────────────────────────────────────────
 
+_DIFFICULTY_CONFIG = {
+    "easy":   {"table_size": 7,  "num_keys": 4, "max_val": 99},
+    "medium": {"table_size": 11, "num_keys": 7, "max_val": 199},
+    "hard":   {"table_size": 13, "num_keys": 9, "max_val": 299},
+}
+
+# (number of collision clusters to force, keys per cluster)
+_COLLISION_PARAMS = {
+    "easy":   (1, 2),
+    "medium": (2, 2),
+    "hard":   (3, 3),
+}
+
+# Quadratic cluster sizes by difficulty: force deeper probe chains
+_QUAD_CLUSTERS = {
+    "easy":   ((1, 3),),          # 1 cluster of 3 → probes up to i=2
+    "medium": ((1, 4), (1, 2)),   # cluster of 4 + cluster of 2 → probes up to i=3
+    "hard":   ((1, 4), (1, 3)),   # cluster of 4 + cluster of 3 → probes up to i=3/i=2
+}
+
+_TABLE_SIZES = tuple(cfg["table_size"] for cfg in _DIFFICULTY_CONFIG.values())
+_MAX_KEY     = max(cfg["max_val"] for cfg in _DIFFICULTY_CONFIG.values())
+
+# Quadratic hints, already joined: _QP_HINTS[m][h0][i] lists probes 0..i from h0
+_QP_HINTS = {
+    m: [
+        list(itertools.accumulate(
+            (f"i={i}: ({h0} + {i}²) mod {m} = ?" for i in range(m // 2 + 1)),
+            lambda hint, line: f"{hint} | {line}",
+        ))
+        for h0 in range(m)
+    ]
+    for m in _TABLE_SIZES
+}
+
+# Home slot of every key the generators can produce: _HOME[m][k] = k mod m
+_HOME = {m: [k % m for k in range(_MAX_KEY + 1)] for m in _TABLE_SIZES}
+
+# Precomputed probe sequences so the builders index a row instead of taking a
+# modulo per probe: _LINEAR_NEXT[m][h0][i] = (h0 + i) mod m, and so on.
+_LINEAR_NEXT = {
+    m: [[(h0 + i) % m for i in range(m)] for h0 in range(m)]
+    for m in _TABLE_SIZES
+}
+# For prime m, i² mod m repeats from i = m//2 + 1 on ((m - i)² ≡ i²), so later
+# probes only revisit occupied slots; stopping there gives the same placements
+# and ends a failed search after (m + 1) / 2 probes instead of m.
+_QUAD_NEXT = {
+    m: [[(h0 + i*i) % m for i in range(m // 2 + 1)] for h0 in range(m)]
+    for m in _TABLE_SIZES
+}
+# Indexed [m][h0][step2]; step2 = 0 never occurs but keeps indexing direct
+_DOUBLE_NEXT = {
+    m: [[[(h0 + i * step2) % m for i in range(m)] for step2 in range(m)] for h0 in range(m)]
+    for m in _TABLE_SIZES
+}
+
+
 def generate_puzzle(technique, difficulty):
     """Generate a hash table puzzle for the given technique and difficulty."""
-    
-    config = {
-        "easy":   {"table_size": 7,  "num_keys": 4, "max_val": 99},
-        "medium": {"table_size": 11, "num_keys": 7, "max_val": 199},
-        "hard":   {"table_size": 13, "num_keys": 9, "max_val": 299},
-    }[difficulty]
-    
+    config     = _DIFFICULTY_CONFIG[difficulty]
     table_size = config["table_size"]
     num_keys   = config["num_keys"]
     max_val    = config["max_val"]
@@ -22,52 +82,39 @@ def generate_puzzle(technique, difficulty):
     if technique == "quadratic_probing":
         keys = _generate_quadratic_keys(table_size, num_keys, max_val, difficulty)
     else:
-        keys = _generate_collision_keys(table_size, num_keys, max_val, difficulty)
-
-    if technique == "linear_probing":
-        return build_linear_probing(keys, table_size)
-    elif technique == "quadratic_probing":
-        return build_quadratic_probing(keys, table_size)
-    elif technique == "double_hashing":
-        return build_double_hashing(keys, table_size)
-    elif technique == "chaining":
-        return build_chaining(keys, table_size)
-    else:
-        return build_linear_probing(keys, table_size)
+        # Chaining only shows insertion order within a bucket, so skip the shuffle
+        keys = _generate_collision_keys(table_size, num_keys, max_val, difficulty,
+                                        shuffle=technique != "chaining")
 
+    builder = _BUILDERS.get(technique, build_linear_probing)
+    return builder(keys, table_size)
 
-def _generate_collision_keys(table_size, num_keys, max_val, difficulty):
+
+def _generate_collision_keys(table_size, num_keys, max_val, difficulty, shuffle=True):
     """Generate keys with forced collisions for linear/double/chaining."""
     keys = []
-    used = set()
+    used_mask = 0  # bit k set once key k is taken
 
-    # How many collision clusters to force
-    clusters = {"easy": 1, "medium": 2, "hard": 3}[difficulty]
-    cluster_size = {"easy": 2, "medium": 2, "hard": 3}[difficulty]
+    clusters, cluster_size = _COLLISION_PARAMS[difficulty]
 
     for _ in range(clusters):
-        base_hash = random.randint(0, table_size - 1)
+        base_hash = _rng.randint(0, table_size - 1)
         for j in range(cluster_size):
             # Keys that all hash to base_hash: k = base_hash + j*table_size
             k = base_hash + j * table_size
-            if 1 <= k <= max_val and k not in used:
+            if 1 <= k <= max_val and not (used_mask >> k) & 1:
                 keys.append(k)
-                used.add(k)
+                used_mask |= 1 << k
 
     # Fill remaining with random non-duplicate keys
-    attempts = 0
-    while len(keys) < num_keys and attempts < 1000:
-        k = random.randint(1, max_val)
-        if k not in used:
-            keys.append(k)
-            used.add(k)
-        attempts += 1
+    _fill_random_keys(keys, used_mask, num_keys, max_val)
 
-    random.shuffle(keys)
-    return keys[:num_keys]
+    if not shuffle:
+        return keys[:num_keys]
+    return _rng.sample(keys, min(len(keys), num_keys))
 
 
-def _generate_quadratic_keys(table_size, num_keys, max_val, difficulty):
+def _generate_quadratic_keys(table_size, num_keys, max_val, difficulty, shuffle=True):
     """
     Generate keys that cause deep quadratic probe chains.
     Strategy: pick 3-4 keys that all share the same h0 = k % table_size,
@@ -75,72 +122,80 @@ def _generate_quadratic_keys(table_size, num_keys, max_val, difficulty):
     Also mix in a second collision cluster so not all keys land in one spot.
     """
     keys = []
-    used = set()
-
-    # Cluster sizes by difficulty: force deeper probe chains
-    cluster_configs = {
-        "easy":   [(1, 3)],           # 1 cluster of 3 → probes up to i=2
-        "medium": [(1, 4), (1, 2)],   # cluster of 4 + cluster of 2 → probes up to i=3
-        "hard":   [(1, 4), (1, 3)],   # cluster of 4 + cluster of 3 → probes up to i=3/i=2
-    }[difficulty]
+    used_mask = 0  # bit k set once key k is taken
 
-    for (_, size) in cluster_configs:
-        base_hash = random.randint(1, table_size - 2)
+    for (_, size) in _QUAD_CLUSTERS[difficulty]:
+        base_hash = _rng.randint(1, table_size - 2)
         for j in range(size):
             # All these keys share the same initial hash = base_hash
             k = base_hash + j * table_size
-            if 1 <= k <= max_val and k not in used:
+            if 1 <= k <= max_val and not (used_mask >> k) & 1:
                 keys.append(k)
-                used.add(k)
+                used_mask |= 1 << k
 
     # Fill remainder with randoms
-    attempts = 0
-    while len(keys) < num_keys and attempts < 1000:
-        k = random.randint(1, max_val)
-        if k not in used:
+    _fill_random_keys(keys, used_mask, num_keys, max_val)
+
+    if not shuffle:
+        return keys[:num_keys]
+    return _rng.sample(keys, min(len(keys), num_keys))
+
+
+def _fill_random_keys(keys, used_mask, num_keys, max_val):
+    """
+    Top keys up to num_keys with distinct random values in 1..max_val.
+    Candidates are drawn in one batch; at most len(keys) of them can already
+    be taken, so over-drawing by that much always covers the shortfall.
+    """
+    need = num_keys - len(keys)
+    if need <= 0:
+        return
+    candidates = _rng.sample(range(1, max_val + 1), min(max_val, need + len(keys)))
+    for k in candidates:
+        if not (used_mask >> k) & 1:
             keys.append(k)
-            used.add(k)
-        attempts += 1
+            need -= 1
+            if not need:
+                break
+
 
-    random.shuffle(keys)
-    return keys[:num_keys]
+def _first_free(table, probe_seq):
+    """Return the probe index of the first empty slot along probe_seq, or -1."""
+    for i, h in enumerate(probe_seq):
+        if table[h] is None:
+            return i
+    return -1
 
 
 def build_linear_probing(keys, table_size):
     table = [None] * table_size
+    home = _HOME[table_size]
     steps = []
     
     for key in keys:
-        h = key % table_size
-        original_h = h
-        probe = 0
-        placed = False
-        probe_seq = [h]
+        original_h = home[key]
+        probe_seq = _LINEAR_NEXT[table_size][original_h]
+        probe = _first_free(table, probe_seq)
         
-        while probe < table_size:
-            if table[h] is None:
-                table[h] = key
-                # Hint: show the formula expression but NOT the resolved slot number
-                if probe == 0:
-                    hint = f"h({key}) = {key} mod {table_size} = ?"
-                else:
-                    hint = f"h({key}) = {key} mod {table_size} = {original_h} → collision(s), probe i=1..{probe}"
-                steps.append({
-                    "key": key,
-                    "initial_hash": original_h,
-                    "probe_sequence": probe_seq,
-                    "final_index": h,
-                    "collisions": probe,
-                    "formula": hint
-                })
-                placed = True
-                break
-            probe += 1
-            h = (original_h + probe) % table_size
-            probe_seq.append(h)
-        
-        if not placed:
+        if probe < 0:
             steps.append({"key": key, "error": "Table full"})
+            continue
+        
+        h = probe_seq[probe]
+        table[h] = key
+        # Hint: show the formula expression but NOT the resolved slot number
+        if probe == 0:
+            hint = f"h({key}) = {key} mod {table_size} = ?"
+        else:
+            hint = f"h({key}) = {key} mod {table_size} = {original_h} → collision(s), probe i=1..{probe}"
+        steps.append({
+            "key": key,
+            "initial_hash": original_h,
+            "probe_sequence": probe_seq[:probe+1],
+            "final_index": h,
+            "collisions": probe,
+            "formula": hint
+        })
     
     return {
         "technique": "linear_probing",
@@ -156,41 +211,34 @@ def build_linear_probing(keys, table_size):
 
 def build_quadratic_probing(keys, table_size):
     table = [None] * table_size
+    home = _HOME[table_size]
     steps = []
     
     for key in keys:
-        h0 = key % table_size
-        placed = False
-        probe_seq = [h0]
+        h0 = home[key]
+        probe_seq = _QUAD_NEXT[table_size][h0]
+        i = _first_free(table, probe_seq)
         
-        for i in range(table_size):
-            h = (h0 + i*i) % table_size
-            if i > 0:
-                probe_seq.append(h)
-            if table[h] is None:
-                table[h] = key
-                # Show the formula with the i² expansion but leave final slot blank
-                if i == 0:
-                    hint = f"h({key}) = {key} mod {table_size} = ?"
-                else:
-                    # Show each probe step as an unsolved expression
-                    probe_exprs = []
-                    for p in range(i + 1):
-                        probe_exprs.append(f"i={p}: ({h0} + {p}²) mod {table_size} = ?")
-                    hint = " | ".join(probe_exprs)
-                steps.append({
-                    "key": key,
-                    "initial_hash": h0,
-                    "probe_sequence": probe_seq[:i+1],
-                    "final_index": h,
-                    "collisions": i,
-                    "formula": hint
-                })
-                placed = True
-                break
-        
-        if not placed:
+        if i < 0:
             steps.append({"key": key, "error": "No slot found (quadratic probing exhausted)"})
+            continue
+        
+        h = probe_seq[i]
+        table[h] = key
+        # Show the formula with the i² expansion but leave final slot blank
+        if i == 0:
+            hint = f"h({key}) = {key} mod {table_size} = ?"
+        else:
+            # Show each probe step as an unsolved expression
+            hint = _QP_HINTS[table_size][h0][i]
+        steps.append({
+            "key": key,
+            "initial_hash": h0,
+            "probe_sequence": probe_seq[:i+1],
+            "final_index": h,
+            "collisions": i,
+            "formula": hint
+        })
     
     return {
         "technique": "quadratic_probing",
@@ -206,44 +254,37 @@ def build_quadratic_probing(keys, table_size):
 
 def build_double_hashing(keys, table_size):
     table = [None] * table_size
+    home = _HOME[table_size]
     steps = []
     
-    # h2 must never be 0, use: h2(k) = 1 + (k mod (m-1))
-    def h2(k):
-        return 1 + (k % (table_size - 1))
-    
     for key in keys:
-        h0 = key % table_size
-        step2 = h2(key)
-        placed = False
-        probe_seq = [h0]
+        h0 = home[key]
+        # h2 must never be 0, use: h2(k) = 1 + (k mod (m-1))
+        step2 = 1 + (key % (table_size - 1))
+        probe_seq = _DOUBLE_NEXT[table_size][h0][step2]
+        i = _first_free(table, probe_seq)
         
-        for i in range(table_size):
-            h = (h0 + i * step2) % table_size
-            if i > 0:
-                probe_seq.append(h)
-            if table[h] is None:
-                # Show both hash function expressions unsolved
-                if i == 0:
-                    hint = f"h1({key}) = {key} mod {table_size} = ? | h2({key}) = 1 + ({key} mod {table_size-1}) = ?"
-                else:
-                    hint = (f"h1({key}) = {key} mod {table_size} = {h0} | "
-                            f"h2({key}) = 1 + ({key} mod {table_size-1}) = {step2} | "
-                            f"collision(s) → i={i}: ({h0} + {i}×{step2}) mod {table_size} = ?")
-                steps.append({
-                    "key": key,
-                    "initial_hash": h0,
-                    "h2_value": step2,
-                    "probe_sequence": probe_seq[:i+1],
-                    "final_index": h,
-                    "collisions": i,
-                    "formula": hint
-                })
-                placed = True
-                break
-        
-        if not placed:
+        if i < 0:
             steps.append({"key": key, "error": "Table full"})
+            continue
+        
+        h = probe_seq[i]
+        # Show both hash function expressions unsolved
+        if i == 0:
+            hint = f"h1({key}) = {key} mod {table_size} = ? | h2({key}) = 1 + ({key} mod {table_size-1}) = ?"
+        else:
+            hint = (f"h1({key}) = {key} mod {table_size} = {h0} | "
+                    f"h2({key}) = 1 + ({key} mod {table_size-1}) = {step2} | "
+                    f"collision(s) → i={i}: ({h0} + {i}×{step2}) mod {table_size} = ?")
+        steps.append({
+            "key": key,
+            "initial_hash": h0,
+            "h2_value": step2,
+            "probe_sequence": probe_seq[:i+1],
+            "final_index": h,
+            "collisions": i,
+            "formula": hint
+        })
     
     return {
         "technique": "double_hashing",
@@ -259,34 +300,68 @@ def build_double_hashing(keys, table_size):
 
 def build_chaining(keys, table_size):
     table = [[] for _ in range(table_size)]
+    home = _HOME[table_size]
     steps = []
     
     for key in keys:
-        h = key % table_size
-        table[h].append(key)
+        h = home[key]
+        chain = table[h]
+        chain.append(key)
         steps.append({
             "key": key,
             "initial_hash": h,
             "final_index": h,
-            "chain_length": len(table[h]),
+            "chain_length": len(chain),
             "formula": f"{key} % {table_size} = {h}"
         })
     
-    # Convert to serializable format
-    solution = [list(chain) for chain in table]
-    
     return {
         "technique": "chaining",
         "technique_label": "Separate Chaining",
         "table_size": table_size,
         "keys": keys,
-        "solution": solution,
+        "solution": table,
         "steps": steps,
         "description": "Each slot holds a linked list. Colliding keys are chained together.",
         "formula_label": "h(k) = k mod m → append to chain at index"
     }
 
 
+# Technique → builder dispatch; unknown techniques fall back to linear probing
+_BUILDERS = {
+    "linear_probing":    build_linear_probing,
+    "quadratic_probing": build_quadratic_probing,
+    "double_hashing":    build_double_hashing,
+    "chaining":          build_chaining,
+}
+
+
+def _encode(puzzle):
+    return json.dumps(puzzle, separators=(",", ":")).encode()
+
+
+@functools.lru_cache(maxsize=256)
+def _puzzle_json(technique, difficulty, salt):
+    """
+    Encoded JSON body for a puzzle, cached per (technique, difficulty, salt)
+    so cache hits skip both generation and encoding; pass a new salt to get
+    a fresh puzzle.
+    """
+    return _encode(generate_puzzle(technique, difficulty))
+
+
+# Pre-encoded puzzles generated at startup; unseeded requests rotate through
+# these so the common path never runs the generator.
+_POOL_SIZE = 16
+_POOL_CYCLE = {
+    (technique, difficulty): itertools.cycle(
+        [_encode(generate_puzzle(technique, difficulty)) for _ in range(_POOL_SIZE)]
+    )
+    for technique in _BUILDERS
+    for difficulty in _DIFFICULTY_CONFIG
+}
+
+
 # ─── Routes ──────────────────────────────────────────────────────────
 
 @app.route("/")
@@ -297,9 +372,25 @@ def index():
 def get_puzzle():
     technique  = request.args.get("technique", "linear_probing")
     difficulty = request.args.get("difficulty", "easy")
-    puzzle = generate_puzzle(technique, difficulty)
-    return jsonify(puzzle)
+    seed       = request.args.get("seed")
+    pool = _POOL_CYCLE.get((technique, difficulty))
+    if pool is not None and not seed:
+        body = next(pool)
+    else:
+        # Seeded or unrecognised requests are generated on demand; without a
+        # seed they are shared within a 5-second window
+        body = _puzzle_json(technique, difficulty, seed or int(time.time()) // 5)
+    return Response(body, mimetype="application/json")
 
 if __name__ == "__main__":
     print("🚀 Hash Collision Visualizer running at http://localhost:5050")
-    app.run(debug=True, port=5050)
+    if os.environ.get("FLASK_ENV") == "development":
+        app.run(debug=True, port=5050)
+    else:
+        try:
+            from waitress import serve
+        except ImportError:
+            # waitress is optional; fall back to the threaded dev server
+            app.run(port=5050)
+        else:
+            serve(app, host="127.0.0.1", port=5050, threads=8)